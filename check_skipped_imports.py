@@ -5,64 +5,327 @@ except ImportError as e:
         "This script requires the python library pandas. Please install it to your environment."
     ) from e
 
+try:
+    from rapidfuzz import process
+    from rapidfuzz.distance import Indel
+except ImportError:
+    # rapidfuzz is optional; without it we fall back to the (much slower) difflib
+    process = None
+try:
+    import pyarrow  # noqa: F401
+except ImportError:
+    # pyarrow is optional; it speeds up reading CSVs
+    pyarrow = None
+
 import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
 from difflib import SequenceMatcher
+import hashlib
+from itertools import repeat
+import math
+import os
 from pathlib import Path
 
+import numpy as np
+
 pd.options.mode.copy_on_write = True
 
 
+# Names with fewer characters than this (not counting the "," between last and first
+# name) are only checked for exact matches
+MIN_FUZZY_NAME_LENGTH = 3
+
+
+def _matches_frame(
+    names: list[str],
+    match_type: str,
+    similarities: list[float] | np.ndarray,
+    existing_matches: list[list[str]],
+) -> pd.DataFrame:
+    """Build a DataFrame of matches in the format returned by find_potential_duplicates."""
+    return pd.DataFrame(
+        {
+            "name": pd.Series(names, dtype=object),
+            "match_type": match_type,
+            "similarity": pd.Series(similarities, dtype=float),
+            "existing_matches": pd.Series(existing_matches, dtype=object),
+        }
+    )
+
+
+def _rapidfuzz_fuzzy_matches(
+    names1: list[str], names2: list[str], threshold: float
+) -> pd.DataFrame:
+    """Find the names in names1 with a match in names2 with similarity >= threshold.
+
+    All pairs are scored in a single multi-threaded C++ call to rapidfuzz, and the
+    rows with a match are found with numpy. Note that rapidfuzz's ratio is based
+    on the Indel distance, so scores can be slightly higher than difflib's for the
+    same pair.
+    """
+    if not names1 or not names2:
+        return _matches_frame([], "fuzzy", [], [])
+    # Indel.normalized_similarity is fuzz.ratio on a 0-1 scale. The score matrix is
+    # float32 to save memory, so the cutoff is loosened slightly to keep pairs right at
+    # the threshold, and the scores we report are recomputed exactly below.
+    cutoff = max(threshold - 1e-6, 0)
+    # Scores below the cutoff are set to 0
+    scores = process.cdist(
+        names1,
+        names2,
+        scorer=Indel.normalized_similarity,
+        score_cutoff=cutoff,
+        workers=-1,
+    )
+    candidate_rows = np.flatnonzero(scores.max(axis=1) >= cutoff)
+    # Only build the list of matching names for the rows that may have a match
+    hit_names = []
+    similarities = []
+    existing_matches = []
+    for i in candidate_rows:
+        name = names1[i]
+        matches = [
+            (names2[j], Indel.normalized_similarity(name, names2[j]))
+            for j in np.flatnonzero(scores[i] >= cutoff)
+        ]
+        matches = [match for match in matches if match[1] >= threshold]
+        if matches:
+            matches.sort(key=lambda x: x[1], reverse=True)
+            hit_names.append(name)
+            similarities.append(matches[0][1])
+            existing_matches.append([match[0] for match in matches])
+    return _matches_frame(hit_names, "fuzzy", similarities, existing_matches)
+
+
+def _length_window(length: int, threshold: float, max_len: int) -> tuple[int, int]:
+    """Range of string lengths that could reach threshold similarity with a string of
+    the given length (inclusive). A small tolerance guards against float rounding."""
+    if threshold <= 0:
+        return 0, max_len
+    lo = math.ceil(length * threshold / (2 - threshold) - 1e-9)
+    hi = math.floor(length * (2 - threshold) / threshold + 1e-9)
+    return lo, min(hi, max_len)
+
+
+def _difflib_fuzzy_matches(
+    names1: list[str], names2: list[str], threshold: float
+) -> pd.DataFrame:
+    """Find the names in names1 with a match in names2 with similarity >= threshold.
+
+    The cheap upper bounds real_quick_ratio() and quick_ratio() are checked before the
+    full ratio(), which rejects most pairs without running the full matcher. Scores are
+    the same as SequenceMatcher(None, name, existing).ratio().
+
+    Candidates are also filtered by length: ratio() is at most 2*min(L1, L2)/(L1 + L2),
+    so names whose lengths differ too much can never reach the threshold. names2 is
+    sorted by length once, so the candidates for each name are one contiguous slice.
+    """
+    names2 = sorted(names2, key=len)
+    lens2 = np.char.str_len(np.array(names2, dtype=str))
+    max_len = int(lens2[-1]) if len(lens2) else 0
+
+    hit_names = []
+    similarities = []
+    existing_matches = []
+    # Reuse one matcher. The query name must stay seq1 and the candidate seq2, as in
+    # SequenceMatcher(None, name, existing): ratio() is not symmetric, so swapping them
+    # changes scores. Re-indexing the candidate (b2j) is cheap for short names.
+    sm = SequenceMatcher()
+    for name in names1:
+        sm.set_seq1(name)
+        lo, hi = _length_window(len(name), threshold, max_len)
+        start = np.searchsorted(lens2, lo, side="left")
+        stop = np.searchsorted(lens2, hi, side="right")
+        matches = []
+        for existing in names2[start:stop]:
+            sm.set_seq2(existing)
+            if sm.real_quick_ratio() < threshold or sm.quick_ratio() < threshold:
+                continue
+            similarity = sm.ratio()
+            if similarity >= threshold:
+                matches.append((existing, similarity))
+        if matches:
+            matches.sort(key=lambda x: x[1], reverse=True)
+            hit_names.append(name)
+            similarities.append(matches[0][1])
+            existing_matches.append([match[0] for match in matches])
+    return _matches_frame(hit_names, "fuzzy", similarities, existing_matches)
+
+
+def _parallel_difflib_fuzzy_matches(
+    names1: list[str], names2: list[str], threshold: float, chunk_size: int = 32
+) -> pd.DataFrame:
+    """Run _difflib_fuzzy_matches over chunks of names1 on all CPU cores.
+
+    difflib is pure Python, so we need processes rather than threads to get around the
+    GIL.
+    """
+    chunks = [names1[i : i + chunk_size] for i in range(0, len(names1), chunk_size)]
+    if len(chunks) <= 1 or (os.cpu_count() or 1) <= 1:
+        return _difflib_fuzzy_matches(names1, names2, threshold)
+    with ProcessPoolExecutor() as executor:
+        frames = executor.map(
+            _difflib_fuzzy_matches, chunks, repeat(names2), repeat(threshold)
+        )
+        return pd.concat(list(frames), ignore_index=True)
+
+
+def _one_edit_neighbours(key: str, alphabet: set[str]) -> set[str]:
+    """All strings at most one edit (delete, substitute or insert) away from key."""
+    splits = [(key[:i], key[i:]) for i in range(len(key) + 1)]
+    deletes = {a + b[1:] for a, b in splits if b}
+    substitutions = {a + c + b[1:] for a, b in splits if b for c in alphabet}
+    inserts = {a + c + b for a, b in splits for c in alphabet}
+    return {key} | deletes | substitutions | inserts
+
+
+def _blocked_difflib_fuzzy_matches(
+    names1: list[str], names2: list[str], threshold: float
+) -> pd.DataFrame:
+    """Run _difflib_fuzzy_matches only between names whose last names sound alike.
+
+    Names are grouped ("blocked") by the metaphone code of their last name, and each
+    name in names1 is only compared against the blocks of names2 whose code is at most
+    one edit away from its own. Names with no such block are compared against all of
+    names2.
+    """
+    try:
+        import jellyfish
+    except ImportError as e:
+        raise ImportError(
+            "Phonetic blocking requires the python library jellyfish. Please install it to your environment."
+        ) from e
+
+    def phonetic_key(name: str) -> str:
+        return jellyfish.metaphone(name.split(",", 1)[0])
+
+    blocks = defaultdict(list)
+    for existing in names2:
+        blocks[phonetic_key(existing)].append(existing)
+    queries = defaultdict(list)
+    for name in names1:
+        queries[phonetic_key(name)].append(name)
+    # Neighbouring keys only need letters that actually occur in some block's key
+    alphabet = set("".join(blocks))
+
+    frames = [_matches_frame([], "fuzzy", [], [])]
+    for query_key, query_names in queries.items():
+        candidates = [
+            existing
+            for key in _one_edit_neighbours(query_key, alphabet)
+            for existing in blocks.get(key, ())
+        ]
+        frames.append(
+            _difflib_fuzzy_matches(query_names, candidates or names2, threshold)
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
 def find_potential_duplicates(
-    names1: list[str], names2: list[str], threshold: float = 0.75
+    names1: list[str],
+    names2: list[str],
+    threshold: float = 0.75,
+    phonetic_blocking: bool = False,
 ) -> pd.DataFrame:
     """Compare two lists of names to find exact and fuzzy matches.
 
+    Names are expected to already be normalized with normalize_names.
+
     Parameters:
         names1: First set of names to compare
         names2: Second set of names to compare
         threshold: Float between 0 and 1 for fuzzy matching similarity threshold
+        phonetic_blocking: Without rapidfuzz, only fuzzy match names whose last names
+            sound alike. Much faster with the difflib fallback, but can miss typos that
+            change how a name sounds. Ignored when rapidfuzz is installed.
 
     Returns:
-        DataFrame containing potential matches with columns:
+        DataFrame containing potential matches, sorted by similarity, with columns:
         - name: Original name from names1
         - match_type: 'exact' or 'fuzzy'
         - similarity: Float similarity score
         - existing_matches: List of matching names from names2
     """
-    results = []
-    # Convert inputs to lists of cleaned strings
-    names1 = [str(n).lower().strip() for n in names1 if pd.notna(n)]
-    names2 = set(str(n).lower().strip() for n in names2 if pd.notna(n))
+    # Deduplicate the names we compare against, keeping their order
+    names2 = list(dict.fromkeys(names2))
 
-    for name in names1:
-        # Check for exact matches first
-        if name in names2:
-            results.append(
-                {
-                    "name": name,
-                    "match_type": "exact",
-                    "similarity": 1.0,
-                    "existing_matches": [name],
-                }
-            )
-            continue
-        # If no exact match, check for fuzzy matches
-        close_matches = []
-        for existing in names2:
-            similarity = SequenceMatcher(None, name, existing).ratio()
-            if similarity >= threshold:
-                close_matches.append((existing, similarity))
-        if close_matches:
-            close_matches.sort(key=lambda x: x[1], reverse=True)
-            results.append(
-                {
-                    "name": name,
-                    "match_type": "fuzzy",
-                    "similarity": close_matches[0][1],
-                    "existing_matches": [match[0] for match in close_matches],
-                }
+    # Check for exact matches first, all at once with a set intersection
+    exact_set = frozenset(names2).intersection(names1)
+    exact_names = [name for name in names1 if name in exact_set]
+    exact_matches = _matches_frame(
+        exact_names, "exact", [1.0] * len(exact_names), [[n] for n in exact_names]
+    )
+    # If no exact match, check for fuzzy matches. Very short names (e.g. "li," with no
+    # first name) are skipped, since any match for them would be meaningless.
+    fuzzy_names = [
+        name
+        for name in names1
+        if name not in exact_set
+        and len(name.replace(",", "", 1).strip()) >= MIN_FUZZY_NAME_LENGTH
+    ]
+    if process is not None:
+        if phonetic_blocking:
+            # One cdist call over all pairs beats many small per-block calls
+            print(
+                "Warning: rapidfuzz is installed, so phonetic blocking is not needed and is ignored"
             )
-    return pd.DataFrame(results).sort_values(by="similarity", ascending=False)
+        fuzzy_matches = _rapidfuzz_fuzzy_matches(fuzzy_names, names2, threshold)
+    elif phonetic_blocking:
+        # Blocks are small, so it isn't worth starting worker processes for each one
+        fuzzy_matches = _blocked_difflib_fuzzy_matches(fuzzy_names, names2, threshold)
+    else:
+        fuzzy_matches = _parallel_difflib_fuzzy_matches(fuzzy_names, names2, threshold)
+    return pd.concat([exact_matches, fuzzy_matches], ignore_index=True).sort_values(
+        by="similarity", ascending=False
+    )
+
+
+# Number of matches printed by check_skipped_imports unless verbose is set
+N_MATCHES_TO_PRINT = 20
+
+# Parsed CSVs are cached here as parquet. The repo's data/ is already kept out of git.
+CACHE_DIR = Path(__file__).parent / "data" / ".cache"
+
+
+def read_csv_cached(file: Path) -> pd.DataFrame:
+    """Read a CSV file of strings, caching the parsed result as parquet.
+
+    The cache is keyed on the file's path, size and modification time, so it is
+    invalidated whenever the file changes, and older entries for the same path are
+    removed. If the cache can't be written (e.g. a read-only directory), the CSV is
+    just parsed every time, as it is without pyarrow.
+    """
+    if pyarrow is None:
+        return pd.read_csv(file, dtype=str)
+    stat = file.stat()
+    path_key = hashlib.md5(str(file.resolve()).encode(), usedforsecurity=False)
+    prefix = f"{path_key.hexdigest()}-"
+    cache = CACHE_DIR / f"{prefix}{stat.st_mtime_ns}-{stat.st_size}.parquet"
+    if cache.exists():
+        try:
+            return pd.read_parquet(cache)
+        except Exception:
+            # Unreadable cache entry, drop it and parse the CSV again
+            with suppress(OSError):
+                cache.unlink(missing_ok=True)
+    # Multi-threaded C++ parser, with strings stored as Arrow arrays
+    df = pd.read_csv(file, dtype="string[pyarrow]", engine="pyarrow")
+    # Write to a temporary file first so an interrupted run can't leave a partial entry
+    tmp = cache.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(tmp, compression="zstd")
+        os.replace(tmp, cache)
+        # Entries for older versions of this file will never be read again
+        for old in CACHE_DIR.glob(f"{prefix}*.parquet"):
+            if old != cache:
+                old.unlink(missing_ok=True)
+    except OSError:
+        with suppress(OSError):
+            tmp.unlink(missing_ok=True)
+    return df
 
 
 def load_and_validate_csv(
@@ -78,7 +341,7 @@ def load_and_validate_csv(
     Returns:
         Loaded DataFrame
     """
-    df = pd.read_csv(file, dtype=str)
+    df = read_csv_cached(file)
 
     missing_cols = set(name_cols) - set(df.columns)
     if missing_cols:
@@ -100,21 +363,22 @@ def combine_name_parts(df, columns):
         columns: list of column names [last_name, first_name, middle_name]
 
     Returns:
-        list of combined names, with proper handling of NaN values
+        list of combined names, with proper handling of NaN values. Rows with no name
+        data at all are skipped with a warning.
     """
+    last, first, middle = [
+        df[col].fillna("").astype(str).str.strip() for col in columns
+    ]
+    empty = (last == "") & (first == "") & (middle == "")
+    if empty.any():
+        print(f"Warning: skipping {empty.sum()} row(s) with no name data")
+    combined_names = (last + ", " + first + " " + middle).str.strip()
+    return combined_names[~empty].tolist()
 
-    def clean_name_part(x):
-        return str(x) if pd.notna(x) else ""
 
-    combined_names = []
-    for parts in zip(*[df[col] for col in columns]):
-        cleaned_parts = [clean_name_part(part) for part in parts]
-        last, first, middle = cleaned_parts
-        full_name = f"{last}, {first} {middle}".strip()
-        if not full_name:
-            raise ValueError("Invalid name: {parts}")
-        combined_names.append(full_name)
-    return combined_names
+def normalize_names(names: list[str]) -> list[str]:
+    """Lowercase and strip names so they can be compared with each other."""
+    return pd.Series(names, dtype=str).str.lower().str.strip().tolist()
 
 
 def check_skipped_imports(
@@ -124,6 +388,8 @@ def check_skipped_imports(
     skipped_cols: list[str],
     similarity_threshold: float,
     outfile: Path | None = None,
+    phonetic_blocking: bool = False,
+    verbose: bool = False,
 ) -> pd.DataFrame:
     """Check skipped entries against all Broadstripes entries for potential duplicates.
 
@@ -134,6 +400,9 @@ def check_skipped_imports(
         skipped_cols: List of [last, first, middle] column names in skipped_entries CSV
         similarity_threshold: Threshold for fuzzy matching (0-1)
         outfile: Optional path to save results CSV
+        phonetic_blocking: Without rapidfuzz, only fuzzy match names whose last names
+            sound alike
+        verbose: Print all matches instead of only the top ones
 
     Returns:
         DataFrame of potential matches
@@ -145,18 +414,27 @@ def check_skipped_imports(
     new_df = load_and_validate_csv(skipped_entries, skipped_cols, "skipped additions")
 
     # Create standardized names using original format
-    names1 = combine_name_parts(new_df, skipped_cols)
-    names2 = combine_name_parts(existing_df, all_bs_cols)
+    names1 = normalize_names(combine_name_parts(new_df, skipped_cols))
+    names2 = normalize_names(combine_name_parts(existing_df, all_bs_cols))
 
     # Find matches
-    matches = find_potential_duplicates(names1, names2, similarity_threshold)
+    matches = find_potential_duplicates(
+        names1,
+        names2,
+        similarity_threshold,
+        phonetic_blocking=phonetic_blocking,
+    )
 
     print(f"\nFound {len(matches)} potential matches")
-    # Print whole df
+    # Print whole df if asked to, otherwise just the top matches (printing thousands of
+    # rows can take longer than the matching itself). The full results are in outfile.
     with pd.option_context(
         "display.max_rows", None, "display.max_columns", None, "display.width", None
     ):
-        print(matches)
+        print(matches if verbose else matches.head(N_MATCHES_TO_PRINT))
+    if not verbose and len(matches) > N_MATCHES_TO_PRINT:
+        n_more = len(matches) - N_MATCHES_TO_PRINT
+        print(f"... and {n_more} more (use --verbose to print all)")
     if outfile:
         matches.to_csv(outfile, index=False)
         print(f"\nWrote results to '{outfile}'")
@@ -202,6 +480,16 @@ if __name__ == "__main__":
     parser.add_argument(
         "--outfile", type=Path, help="Optional path to save results CSV", default=None
     )
+    parser.add_argument(
+        "--phonetic_blocking",
+        action="store_true",
+        help="Only fuzzy match names whose last names sound alike (requires jellyfish). Speeds up the difflib fallback on large lists, but can miss some typos. Ignored when rapidfuzz is installed.",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help=f"Print all matches (by default only the top {N_MATCHES_TO_PRINT} are printed)",
+    )
 
     args = parser.parse_args()
 
@@ -215,4 +503,6 @@ if __name__ == "__main__":
         skipped_cols=args.skipped_cols,
         similarity_threshold=args.similarity_threshold,
         outfile=args.outfile,
+        phonetic_blocking=args.phonetic_blocking,
+        verbose=args.verbose,
     )
@@ -5,11 +5,21 @@ except ImportError as e:
         "This script requires the python library pandas. Please install it to your environment."
     ) from e
 try:
-    import openpyxl  # noqa: F401
-except ImportError as e:
-    raise ImportError(
-        "This script requires the python library openpyxl. Please install it to your environment."
-    ) from e
+    # Rust-based Excel reader, much faster than openpyxl
+    import python_calamine  # noqa: F401
+
+    # pandas only supports the calamine engine from version 2.2
+    if tuple(int(v) for v in pd.__version__.split(".")[:2]) < (2, 2):
+        raise ImportError("The calamine engine requires pandas >= 2.2")
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "This script requires the python library python-calamine or openpyxl. Please install one of them to your environment."
+        ) from e
+    EXCEL_ENGINE = "openpyxl"
 import argparse
 import datetime
 from pathlib import Path
@@ -26,17 +36,18 @@ def load_list(infile: Path) -> pd.DataFrame:
         raise FileNotFoundError(f"Input file '{infile}' does not exist")
     # Load file
     # It's important to use dtype=object or str, otherwise zip code may be cast to float
-    df = pd.read_excel(infile, dtype=str)
+    df = pd.read_excel(infile, dtype=str, engine=EXCEL_ENGINE)
     print(f"Loaded file '{infile}'.")
     print(f"n. rows:\t {df.shape[0]}")
     print(f"Columns:\t {df.columns.tolist()}")
     # Strip unecessary whitespace from all columns (sometimes name data has this issue)
-    df = df.apply(lambda col: col.str.strip())
+    # Cells left empty are set to null here, so one isna() pass below finds all
+    # missing data (empty cells are already read as null)
+    str_cols = df.select_dtypes(include=["object", "string"]).columns
+    df[str_cols] = df[str_cols].apply(
+        lambda col: col.str.strip().where(lambda c: c != "")
+    )
     # Monitor data missingness
-    if (df == "").any().any():
-        raise RuntimeError(
-            "Input data has empty (non-nan) cells, please check data quality"
-        )
     nas = df.isna()
     nas = nas.loc[:, nas.any(axis=0)]
     if nas.any().any():
@@ -50,16 +61,18 @@ def load_list(infile: Path) -> pd.DataFrame:
     return df
 
 
+# Date in the form YYYY.MM.DD. Pattern explanation:
+# \d{4} - exactly 4 digits for year
+# \. - literal dot
+# \d{2} - exactly 2 digits for month
+# \. - literal dot
+# \d{2} - exactly 2 digits for day
+_DATE_RE = re.compile(r"(\d{4})\.(\d{2})\.(\d{2})")
+
+
 def extract_date(text: str) -> str | None:
     """Searches for a date in the form YYYY.MM.DD in a string."""
-    # Pattern explanation:
-    # \d{4} - exactly 4 digits for year
-    # \. - literal dot
-    # \d{2} - exactly 2 digits for month
-    # \. - literal dot
-    # \d{2} - exactly 2 digits for day
-    pattern = r"(\d{4})\.(\d{2})\.(\d{2})"
-    match = re.search(pattern, text)
+    match = _DATE_RE.search(text)
     if match:
         year, month, day = match.groups()
         # Check date validity
@@ -114,11 +127,10 @@ def convert_program_mapping(
         pprint(new_programs)
         raise RuntimeError("Unrecognized program/field of study data")
     # If everything looks good, then map program/field of study to new Employer and Degree columns
-    df[["Employer", "Degree"]] = df.apply(
-        lambda row: program_mapping[row[program_col]],
-        axis=1,
-        result_type="expand",
+    mapping_df = pd.DataFrame.from_dict(
+        program_mapping, orient="index", columns=["Employer", "Degree"]
     )
+    df[["Employer", "Degree"]] = mapping_df.reindex(df[program_col]).to_numpy()
     print(
         f"Parsed {df['Employer'].unique().size} different programs/departments and {df['Degree'].unique().size} different degree types."
     )
@@ -135,34 +147,32 @@ def parse_fullnames(df: pd.DataFrame, fullname_col: str) -> pd.DataFrame:
         raise ValueError(
             f"Input for fullname_col of '{fullname_col}' does not exist in the dataframe, please check its name"
         )
-    last_names = []
-    first_names = []
-    middle_names = []
-    for fullname in df[fullname_col]:
-        if not isinstance(fullname, str) or not fullname.strip():
-            raise ValueError(f"Invalid name value: {fullname}")
-        # Split on first comma to get last name and rest
-        parts = fullname.split(",")
-        if len(parts) != 2:
-            raise ValueError(f"Name must contain exactly one comma: {fullname}")
-        last, rest = parts
-        last = last.strip()
-        rest = rest.strip()
-        # Split the "rest" on spaces
-        parts = rest.split()
-        if parts[-1].endswith("."):  # Is there a middle name?
-            middle = parts[-1]
-            first = " ".join(parts[:-1])
-        else:  # Sometimes there is not, and we treat the whole "rest" as first name
-            first = " ".join(parts)
-            middle = ""
-        last_names.append(last)
-        first_names.append(first)
-        middle_names.append(middle)
+    fullnames = df[fullname_col]
+    invalid = fullnames.isna() | (fullnames.str.strip() == "")
+    if invalid.any():
+        raise ValueError(f"Invalid name value(s): {fullnames[invalid].tolist()}")
+    bad_commas = fullnames.str.count(",") != 1
+    if bad_commas.any():
+        raise ValueError(
+            f"Name must contain exactly one comma: {fullnames[bad_commas].tolist()}"
+        )
+    # Split on the comma to get last name and rest
+    parts = fullnames.str.extract(r"^([^,]*),(.*)$")
+    last = parts[0].str.strip()
+    rest = parts[1].str.split()
+    # Is there a middle name? If the last word of the rest ends with "." it's a middle
+    # initial, otherwise we treat the whole rest as first name
+    last_word = rest.str[-1].fillna("").astype(str)
+    has_middle = last_word.str.endswith(".")
+    middle = last_word.where(has_middle, "")
+    first = rest.where(~has_middle, rest.str[:-1]).str.join(" ")
+    no_first = first == ""
+    if no_first.any():
+        raise ValueError(f"Name has no first name: {fullnames[no_first].tolist()}")
     # And we're done, add to the input dataframe
-    df["Last"] = last_names
-    df["First"] = first_names
-    df["Middle"] = middle_names
+    df["Last"] = last
+    df["First"] = first
+    df["Middle"] = middle
     # Check that no name data was lost from original (the operation is invertible)
     fullnames_reconstructed = (
         df["Last"] + ", " + df["First"] + " " + df["Middle"]
@@ -188,15 +198,20 @@ def check_names_lfm(df: pd.DataFrame, lastc: str, firstc: str, middlec: str):
         print(f"\nWarning: 100% missing data in Middle name column '{middlec}'")
 
 
-def str_combine(*e) -> str:
-    """String-combines a list of address elements.
+def str_combine(*cols: pd.Series, sep: str = " ") -> pd.Series:
+    """String-combines columns of address elements, row by row.
 
     Empty strings and nan-like elements are omitted, and elements are
     strip()ed of whitespace and trailing commas (because some employer
-    data has unnecessary commas). The output is separated by spaces.
+    data has unnecessary commas). The output is separated by `sep`.
     """
-    strs = [str(s).strip().rstrip(",") for s in e if (not pd.isna(s) and s)]
-    return " ".join(strs)
+    cleaned = [c.fillna("").astype(str).str.strip().str.rstrip(",") for c in cols]
+    combined = cleaned[0]
+    for col in cleaned[1:]:
+        # Only add a separator where there is something on both sides of it
+        needs_sep = (combined != "") & (col != "")
+        combined = combined + needs_sep.map({True: sep, False: ""}) + col
+    return combined
 
 
 def make_address_combined(
@@ -207,18 +222,11 @@ def make_address_combined(
     statec: str,
     zipc: str,
 ):
-    addrs = []
-    for _, row in df.iterrows():
-        line1, line2, town, st, zip = row.loc[[l1c, l2c, cityc, statec, zipc]]
-        # Combine strings before the comma
-        addr = str_combine(line1, line2)
-        if town or st or zip:
-            if addr:
-                addr += ", "
-            # Combine strings after the comma
-            addr += str_combine(town, st, zip)
-        addrs.append(addr)
-    df["Address Combined"] = addrs
+    # Combine strings before the comma
+    before = str_combine(df[l1c], df[l2c])
+    # Combine strings after the comma
+    after = str_combine(df[cityc], df[statec], df[zipc])
+    df["Address Combined"] = str_combine(before, after, sep=", ")
     print("\nCombined address column created.")
     return df
 